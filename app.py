@@ -8,41 +8,360 @@ Author: Javier Lianes García
 Version: 1.1
 """
 
-from flask import Flask, request, jsonify, make_response
-from flask_cors import CORS
-import requests
 import os
 
+# gunicorn's gevent worker already calls monkey.patch_all() before it imports
+# app:app. GEVENT_PATCH=1 is only needed when this module is imported before
+# that (gunicorn --preload) or served by gevent outside gunicorn, so urllib3,
+# redis and the locks below are created cooperative.
+if os.environ.get("GEVENT_PATCH") == "1":
+    from gevent import monkey
+    monkey.patch_all()
+
+from flask import Flask, request, redirect
+from flask_compress import Compress
+from cachetools import TTLCache
+from urllib.parse import urlencode
+import msgpack
+import msgspec
+import orjson
+import polyline
+import pybreaker
+import redis
+import urllib3
+from concurrent.futures import Future
+import hashlib
+import threading
+
 app = Flask(__name__)
 
+# ---------------------------------------------------------------------------
+# RESPONSE COMPRESSION (br/gzip when the client accepts it)
+# ---------------------------------------------------------------------------
+# Bodies under COMPRESS_MIN_SIZE (errors, empty 204 preflights) are sent as is.
+app.config["COMPRESS_ALGORITHM"] = ["br", "gzip"]
+app.config["COMPRESS_MIN_SIZE"] = 512
+app.config["COMPRESS_LEVEL"] = 4
+app.config["COMPRESS_BR_LEVEL"] = 4
+Compress(app)
+
 # ---------------------------------------------------------------------------
 # CORS CONFIGURATION
 # ---------------------------------------------------------------------------
-CORS(
-    app,
-    resources={r"/*": {"origins": "*"}},
-    allow_headers=["Content-Type"],
-    methods=["GET", "POST", "OPTIONS"],
-    max_age=600,
+# Every endpoint shares one static policy, so the headers are set by a single
+# after_request hook instead of a per-request CORS middleware.
+_CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type",
+    "Access-Control-Max-Age": "600",
+}
+
+
+@app.after_request
+def _cors(resp):
+    """Attach the CORS headers to every response."""
+    resp.headers.update(_CORS_HEADERS)
+    return resp
+
+
+# Preflight answer is static, so it is built once at import and shared. It
+# already carries the final headers the after_request hooks would write (_cors,
+# Flask-Compress's Vary: Accept-Encoding), so they leave it unchanged.
+_PREFLIGHT = app.response_class(
+    b"", status=204, headers={**_CORS_HEADERS, "Vary": "Origin, Accept-Encoding"}
 )
 
+
 @app.route("/route", methods=["OPTIONS"])
 def route_options():
     """Handle preflight requests (for browsers / CDNs)"""
-    resp = make_response("", 204)
-    origin = request.headers.get("Origin", "*")
-    resp.headers["Access-Control-Allow-Origin"] = origin
-    resp.headers["Access-Control-Allow-Methods"] = "POST, OPTIONS"
-    resp.headers["Access-Control-Allow-Headers"] = "Content-Type"
-    resp.headers["Vary"] = "Origin"
-    return resp
+    return _PREFLIGHT
 
 # ---------------------------------------------------------------------------
 # CONFIGURATION
 # ---------------------------------------------------------------------------
 # IMPORTANT: Default to the docker-compose service name (osrm)
 OSRM_BASE = os.environ.get("OSRM_BASE", "http://osrm:5001")
+ROUTE_PREFIX = OSRM_BASE.rstrip("/") + "/route/v1/driving/"
+# lon,lat;lon,lat with fixed 6 decimals (~0.11 m, finer than OSRM snapping)
+_COORD_FMT = "{:.6f},{:.6f};{:.6f},{:.6f}".format
 TIMEOUT = float(os.environ.get("OSRM_TIMEOUT", "15"))
+CONNECT_TIMEOUT = float(os.environ.get("OSRM_CONNECT_TIMEOUT", "2"))
+# Optional in-process routing via libosrm (py-osrm bindings, `pip install
+# osrm-bindings`) when the graph is on this machine; HTTP otherwise.
+# LIBOSRM_DATA loads a .osrm dataset into each worker's own memory;
+# LIBOSRM_SHARED_MEMORY=1 attaches every worker to one copy loaded beforehand
+# with `osrm-datastore`.
+LIBOSRM_DATA = os.environ.get("LIBOSRM_DATA", "")
+LIBOSRM_SHARED_MEMORY = os.environ.get("LIBOSRM_SHARED_MEMORY") == "1"
+LIBOSRM_ALGORITHM = os.environ.get("LIBOSRM_ALGORITHM", "MLD")
+# Circuit breaker: open after N consecutive OSRM failures, retry after M seconds
+BREAKER_FAIL_MAX = int(os.environ.get("OSRM_BREAKER_FAIL_MAX", "10"))
+BREAKER_RESET_TIMEOUT = int(os.environ.get("OSRM_BREAKER_RESET_TIMEOUT", "30"))
+# Max keep-alive sockets per OSRM host and process
+OSRM_POOL_SIZE = int(os.environ.get("OSRM_POOL_SIZE", "64"))
+ROUTE_CACHE_TTL = int(os.environ.get("ROUTE_CACHE_TTL", "1800"))
+ROUTE_CACHE_SIZE = int(os.environ.get("ROUTE_CACHE_SIZE", "20000"))
+# Geometry options accepted from the client (OSRM's own names).
+# Defaults keep the payload small; ?format=geojson restores GeoJSON output.
+OVERVIEWS = ("simplified", "full", "false")
+GEOMETRIES = ("polyline6", "polyline", "geojson")
+# Prebuilt OSRM query strings for every (overview, geometries) combination.
+# Only distance/duration/geometry of the first route are used, so OSRM is
+# told to skip the waypoints array instead of us parsing and dropping it.
+_QUERIES = {
+    (overview, geometries): "?" + urlencode((
+        ("overview", overview), ("geometries", geometries),
+        ("steps", "false"), ("skip_waypoints", "true"),
+    ))
+    for overview in OVERVIEWS
+    for geometries in GEOMETRIES
+}
+# Query params GET /route reads; anything else is dropped from the canonical URL
+ROUTE_QUERY_PARAMS = ("overview", "geometries", "format", "output")
+# GET /route picks its representation from ?output= (not Accept): CDNs such as
+# Cloudflare or Front Door ignore Vary: Accept, so it must be in the URL.
+OUTPUTS = ("json", "msgpack")
+# Sent on GET /route so a CDN in front of the app can serve repeat queries
+ROUTE_CACHE_CONTROL = "public, max-age=3600, s-maxage=86400, stale-while-revalidate=300"
+# Optional shared cache (e.g. redis://redis:6379/0); disabled when empty
+REDIS_URL = os.environ.get("REDIS_URL", "")
+
+# ---------------------------------------------------------------------------
+# REQUEST SCHEMA
+# ---------------------------------------------------------------------------
+class RouteReq(msgspec.Struct, rename={"from_": "from"}):
+    """Body of ``POST /route``: two [lat, lon] points."""
+    from_: tuple[float, float]
+    to: tuple[float, float]
+
+
+ROUTE_DECODER = msgspec.json.Decoder(RouteReq)
+
+
+def _in_bounds(lat, lon):
+    """Check a point is a valid WGS84 coordinate (rejected before calling OSRM)."""
+    return -90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0
+
+# ---------------------------------------------------------------------------
+# HTTP POOL (shared keep-alive connection pool to OSRM)
+# ---------------------------------------------------------------------------
+# block=True makes busy threads wait for a pooled socket instead of opening
+# throwaway connections that are closed (not reused) once the pool is full.
+# The wait is capped (pool_timeout in _osrm_call) so it can't outlast TIMEOUT.
+HTTP = urllib3.PoolManager(
+    num_pools=8,
+    maxsize=OSRM_POOL_SIZE,
+    block=True,
+    headers={"Accept-Encoding": "gzip", "Connection": "keep-alive"},
+    # connect=0/read=0: an unreachable or hung OSRM costs one timeout (and one
+    # breaker failure), not three; only 502/503/504 answers are retried.
+    retries=urllib3.Retry(2, connect=0, read=0, backoff_factor=0.1,
+                          status_forcelist=[502, 503, 504]),
+    timeout=urllib3.Timeout(connect=CONNECT_TIMEOUT, read=TIMEOUT),
+)
+
+
+class OSRMError(Exception):
+    """Raised when OSRM cannot be reached or answers with an error."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class OSRMBusyError(OSRMError):
+    """Raised when every pooled OSRM socket stays busy for the whole pool timeout."""
+
+
+# Only timeouts, connection errors and 5xx trip the breaker. A 4xx is a bad
+# query for that request, and an exhausted pool is local saturation: if OSRM
+# is really slow, the calls holding the sockets time out and count instead.
+BREAKER = pybreaker.CircuitBreaker(
+    fail_max=BREAKER_FAIL_MAX,
+    reset_timeout=BREAKER_RESET_TIMEOUT,
+    exclude=[
+        OSRMBusyError,
+        lambda e: isinstance(e, OSRMError) and e.status is not None and e.status < 500,
+    ],
+)
+
+
+# Hot-path helpers bind their module-level collaborators as default args
+# (the _name=NAME parameters) so lookups are LOAD_FAST instead of LOAD_GLOBAL.
+@BREAKER
+def _osrm_call(url, _request=HTTP.request, _loads=orjson.loads,
+               _pool_timeout=CONNECT_TIMEOUT):
+    """GET ``url`` from OSRM and return the decoded JSON body."""
+    try:
+        r = _request("GET", url, pool_timeout=_pool_timeout)
+    except urllib3.exceptions.EmptyPoolError as e:
+        raise OSRMBusyError(f"no free OSRM connection after {_pool_timeout}s") from e
+    except urllib3.exceptions.HTTPError as e:
+        raise OSRMError(e) from e
+    if r.status != 200:
+        raise OSRMError(f"HTTP {r.status} from {url}", r.status)
+
+    try:
+        return _loads(r.data)
+    except orjson.JSONDecodeError as e:
+        raise OSRMError(f"invalid JSON from OSRM: {e}") from e
+
+# ---------------------------------------------------------------------------
+# LIBOSRM ENGINE (optional, skips HTTP + JSON when the graph is local)
+# ---------------------------------------------------------------------------
+# Route() is a blocking C++ call: under the gevent worker it pauses every other
+# request of that worker while it runs (typically a few ms). Without shared
+# memory, each worker also holds its own full copy of the graph.
+OSRM_ENGINE = None
+if LIBOSRM_DATA or LIBOSRM_SHARED_MEMORY:
+    try:
+        # from-import so the repo's osrm/ (Dockerfile dir, a namespace
+        # package) also counts as "bindings missing"
+        from osrm import OSRM, RouteParameters
+    except ImportError:
+        app.logger.warning("libosrm is configured but osrm bindings are missing; using HTTP")
+    else:
+        engine_config = {"algorithm": LIBOSRM_ALGORITHM, "use_shared_memory": LIBOSRM_SHARED_MEMORY}
+        if LIBOSRM_DATA:
+            engine_config["storage_config"] = LIBOSRM_DATA
+        OSRM_ENGINE = OSRM(**engine_config)
+
+
+# Namespace for shared (Redis) cache keys: the graph that actually answers,
+# so deployments on different datasets sharing one Redis never mix routes.
+if OSRM_ENGINE is not None:
+    ROUTE_NAMESPACE = f"libosrm:{LIBOSRM_DATA or 'shm'}:{LIBOSRM_ALGORITHM}"
+else:
+    ROUTE_NAMESPACE = OSRM_BASE
+
+
+def _libosrm_call(engine, lat1, lon1, lat2, lon2, overview, geometries):
+    """Route with the in-process ``engine``, returning the same shape as the HTTP API."""
+    params = RouteParameters(
+        coordinates=[(lon1, lat1), (lon2, lat2)],
+        overview=overview,
+        geometries=geometries,
+        steps=False,
+    )
+    try:
+        native = engine.Route(params)
+    except RuntimeError as e:
+        # libosrm raises for NoRoute / NoSegment / InvalidQuery
+        raise OSRMError(f"libosrm: {e}", 400) from e
+
+    routes = []
+    for rt in native["routes"]:
+        geometry = rt["geometry"] if overview != "false" else None
+        if geometries == "geojson" and geometry is not None:
+            geometry = {
+                "type": "LineString",
+                "coordinates": [[c[0], c[1]] for c in geometry["coordinates"]],
+            }
+        routes.append({"distance": rt["distance"], "duration": rt["duration"],
+                       "geometry": geometry})
+    return {"routes": routes}
+
+# ---------------------------------------------------------------------------
+# ROUTE CACHE
+# ---------------------------------------------------------------------------
+# L1: in-process TTL LRU (per worker). L2: optional Redis shared by every
+# worker and kept across restarts. Keys use coordinates rounded to 5 decimal
+# places (~1 m), enough to absorb GPS jitter on repeated queries.
+ROUTE_CACHE = TTLCache(maxsize=ROUTE_CACHE_SIZE, ttl=ROUTE_CACHE_TTL)
+_CACHE_LOCK = threading.RLock()
+CACHE_STATS = {"hits": 0, "redis_hits": 0, "misses": 0}
+
+REDIS = None
+if REDIS_URL:
+    REDIS = redis.Redis(
+        connection_pool=redis.BlockingConnectionPool.from_url(
+            REDIS_URL, max_connections=32, timeout=0.5,
+            socket_connect_timeout=0.5, socket_timeout=0.5,
+        )
+    )
+
+
+def _cache_key(lat1, lon1, lat2, lon2, *options):
+    """Build the cache key for a pair of [lat, lon] points and geometry options."""
+    return (round(lat1, 5), round(lon1, 5), round(lat2, 5), round(lon2, 5), *options)
+
+
+def _redis_key(key):
+    """Namespace a cache key by routing backend so different graphs never collide."""
+    return f"osrm:{ROUTE_NAMESPACE}:{key}"
+
+
+def _cache_get(key):
+    """Return the cached route for ``key`` (or None) and update the counters."""
+    with _CACHE_LOCK:
+        cached = ROUTE_CACHE.get(key)
+        if cached is not None:
+            CACHE_STATS["hits"] += 1
+            return cached
+
+    if REDIS is not None:
+        try:
+            packed = REDIS.get(_redis_key(key))
+            cached = msgpack.unpackb(packed) if packed is not None else None
+        except redis.RedisError:
+            cached = None
+        except (ValueError, msgpack.UnpackException):
+            cached = None  # corrupt or foreign value: treat as a miss
+        if isinstance(cached, dict):
+            with _CACHE_LOCK:
+                ROUTE_CACHE[key] = cached
+                CACHE_STATS["redis_hits"] += 1
+            return cached
+
+    with _CACHE_LOCK:
+        CACHE_STATS["misses"] += 1
+    return None
+
+
+def _cache_set(key, value):
+    """Store a route payload in both cache levels (write-through)."""
+    with _CACHE_LOCK:
+        ROUTE_CACHE[key] = value
+    if REDIS is not None:
+        try:
+            REDIS.set(_redis_key(key), msgpack.packb(value), ex=ROUTE_CACHE_TTL)
+        except redis.RedisError:
+            pass
+
+# ---------------------------------------------------------------------------
+# REQUEST COALESCING (one OSRM call per key in flight)
+# ---------------------------------------------------------------------------
+# Frontends often fire bursts of identical /route calls (bulk ETA, retries,
+# re-renders). The first caller for a key asks OSRM; concurrent callers for
+# the same key wait on its Future instead of issuing their own round-trip.
+_INFLIGHT = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+
+def _coalesced(key, fetch, *args):
+    """Run ``fetch(*args)`` once per ``key`` among concurrent callers."""
+    with _INFLIGHT_LOCK:
+        future = _INFLIGHT.get(key)
+        leader = future is None
+        if leader:
+            future = _INFLIGHT[key] = Future()
+
+    if not leader:
+        return future.result()
+
+    try:
+        result = fetch(*args)
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _INFLIGHT_LOCK:
+            del _INFLIGHT[key]
 
 # ---------------------------------------------------------------------------
 # HEALTH CHECK
@@ -52,41 +371,224 @@ def health():
     """Simple check to confirm the service is alive."""
     return {"status": "ok"}
 
+# ---------------------------------------------------------------------------
+# METRICS (Prometheus text format)
+# ---------------------------------------------------------------------------
+@app.get("/metrics")
+def metrics():
+    """Expose route cache counters for Prometheus scraping."""
+    with _CACHE_LOCK:
+        stats, size = dict(CACHE_STATS), len(ROUTE_CACHE)
+    body = (
+        "# TYPE route_cache_hits_total counter\n"
+        f"route_cache_hits_total {stats['hits']}\n"
+        "# TYPE route_cache_redis_hits_total counter\n"
+        f"route_cache_redis_hits_total {stats['redis_hits']}\n"
+        "# TYPE route_cache_misses_total counter\n"
+        f"route_cache_misses_total {stats['misses']}\n"
+        "# TYPE route_cache_entries gauge\n"
+        f"route_cache_entries {size}\n"
+    )
+    return app.response_class(body, mimetype="text/plain; version=0.0.4")
+
 # ---------------------------------------------------------------------------
 # ROUTE ENDPOINT
 # ---------------------------------------------------------------------------
-@app.post("/route")
-def route():
-    """Calculate the shortest route using OSRM (distance-based profile)."""
-    data = request.get_json(silent=True) or {}
+def _json(payload, status=200):
+    """Serialize ``payload`` with orjson (much faster than jsonify on big geometries)."""
+    return app.response_class(orjson.dumps(payload), status=status, mimetype="application/json")
 
-    try:
-        lat1, lon1 = data["from"]
-        lat2, lon2 = data["to"]
-    except Exception:
-        return jsonify({"error": "Body must include 'from' and 'to' as [lat, lon]"}), 400
 
-    coords = f"{lon1},{lat1};{lon2},{lat2}"
-    url = f"{OSRM_BASE}/route/v1/driving/{coords}"
-    params = {"overview": "full", "geometries": "geojson", "steps": "false"}
+def _wants_msgpack():
+    """True when the client's Accept header prefers msgpack over JSON."""
+    best = request.accept_mimetypes.best_match(["application/json", "application/msgpack"])
+    return best == "application/msgpack"
 
-    try:
-        r = requests.get(url, params=params, timeout=TIMEOUT)
-        r.raise_for_status()
-    except requests.exceptions.RequestException as e:
-        return jsonify({"error": f"OSRM request failed: {e}"}), 502
 
-    resp = r.json()
+def _etag(body):
+    """ETag of an encoded response body, so it changes whenever the route data does."""
+    return hashlib.blake2b(body, digest_size=12).hexdigest()
+
+
+def _matching_etag(etag):
+    """
+    Return the validator the client holds for ``etag``, or None.
+
+    If-None-Match uses weak comparison (``W/"x"`` matches ``"x"``), and a
+    ``:<coding>`` suffix appended by compression layers (Flask-Compress, CDNs)
+    is ignored, so revalidating a compressed copy still gets a 304.
+    """
+    inm = request.if_none_match
+    if inm.contains_weak(etag):
+        return etag
+    for held in inm.as_set(include_weak=True):
+        if held.partition(":")[0] == etag:
+            return held
+    return None
+
+
+def _cacheable(resp, etag, weak=False):
+    """Mark a GET /route response as cacheable by browsers and CDNs."""
+    resp.set_etag(etag, weak=weak)
+    resp.headers["Cache-Control"] = ROUTE_CACHE_CONTROL
+    return resp
+
+
+def _respond(payload, cacheable=False):
+    """
+    Send a route payload as msgpack if the client asks for it, JSON otherwise.
+
+    POST negotiates through Accept. With ``cacheable`` (GET requests) the
+    format comes from ``?output=`` only, the response gets Cache-Control and
+    an ETag of its body, and a matching If-None-Match gets a 304 instead.
+    """
+    if cacheable:
+        as_msgpack = request.args.get("output") == "msgpack"
+    else:
+        as_msgpack = _wants_msgpack()
+
+    if as_msgpack:
+        body = msgpack.packb(payload, use_bin_type=True, use_single_float=True)
+        resp = app.response_class(body, mimetype="application/msgpack")
+    else:
+        body = orjson.dumps(payload)
+        resp = app.response_class(body, mimetype="application/json")
+    if not cacheable:
+        resp.vary.add("Accept")
+    else:
+        etag = _etag(body)
+        held = _matching_etag(etag)
+        if held is not None:
+            weak = request.if_none_match.is_weak(held)
+            return _cacheable(app.response_class(status=304), held, weak)
+        _cacheable(resp, etag)
+    return resp
+
+
+def _fetch_route(key, lat1, lon1, lat2, lon2, overview, geometries, as_geojson,
+                 _prefix=ROUTE_PREFIX, _fmt=_COORD_FMT, _queries=_QUERIES,
+                 _call=_osrm_call, _cache_set=_cache_set, _engine=OSRM_ENGINE):
+    """
+    Query OSRM and cache the result.
+
+    When ``as_geojson`` is set, the polyline6 geometry returned by OSRM is
+    decoded here into a GeoJSON LineString.
+
+    Returns the response payload, or None when OSRM finds no route.
+    Raises ``OSRMError`` if OSRM fails and ``pybreaker.CircuitBreakerError``
+    while the breaker is open.
+    """
+    if _engine is not None:
+        resp = _libosrm_call(_engine, lat1, lon1, lat2, lon2, overview, geometries)
+    else:
+        url = _prefix + _fmt(lon1, lat1, lon2, lat2)
+        resp = _call(url + _queries[overview, geometries])
     routes = resp.get("routes", [])
     if not routes:
-        return jsonify({"error": "No route found"}), 404
+        return None
 
     route = routes[0]
-    return jsonify({
+    geometry = route.get("geometry")
+    if as_geojson and geometry is not None:
+        geometry = {
+            "type": "LineString",
+            "coordinates": [list(p) for p in polyline.decode(geometry, 6, geojson=True)],
+        }
+    result = {
         "distance_m": route.get("distance"),
         "duration_s": route.get("duration"),
-        "geometry": route.get("geometry")
-    })
+        "geometry": geometry
+    }
+    _cache_set(key, result)
+    return result
+
+
+def _route_response(lat1, lon1, lat2, lon2, cacheable=False,
+                    _cache_get=_cache_get, _coalesced=_coalesced, _fetch=_fetch_route):
+    """
+    Shared /route logic once both points are validated.
+
+    ``cacheable`` (GET requests) is passed on to ``_respond``.
+    """
+    overview = request.args.get("overview", "simplified")
+    geometries = request.args.get("geometries", "polyline6")
+    as_geojson = request.args.get("format") == "geojson"
+    if as_geojson:
+        geometries = "polyline6"
+    if overview not in OVERVIEWS or geometries not in GEOMETRIES:
+        return _json({"error": f"'overview' must be one of {list(OVERVIEWS)}, "
+                               f"'geometries' one of {list(GEOMETRIES)}"}, 400)
+
+    key = _cache_key(lat1, lon1, lat2, lon2, overview, geometries, as_geojson)
+
+    cached = _cache_get(key)
+    if cached is not None:
+        return _respond(cached, cacheable)
+
+    try:
+        result = _coalesced(key, _fetch, key, lat1, lon1, lat2, lon2,
+                            overview, geometries, as_geojson)
+    except pybreaker.CircuitBreakerError:
+        resp = _json({"error": "OSRM temporarily unavailable"}, 503)
+        resp.headers["Retry-After"] = str(BREAKER_RESET_TIMEOUT)
+        return resp
+    except OSRMError as e:
+        return _json({"error": f"OSRM request failed: {e}"}, 502)
+
+    if result is None:
+        return _json({"error": "No route found"}, 404)
+    return _respond(result, cacheable)
+
+
+def _parse_point(value):
+    """Parse a ``"lat,lon"`` query-string value into floats."""
+    lat, lon = value.split(",")
+    return float(lat), float(lon)
+
+
+@app.post("/route")
+def route():
+    """Calculate the shortest route using OSRM (distance-based profile)."""
+    try:
+        req = ROUTE_DECODER.decode(request.get_data(cache=False))
+    except msgspec.DecodeError:
+        return _json({"error": "Body must include 'from' and 'to' as [lat, lon]"}, 400)
+
+    (lat1, lon1), (lat2, lon2) = req.from_, req.to
+    if not (_in_bounds(lat1, lon1) and _in_bounds(lat2, lon2)):
+        return _json({"error": "Coordinates out of range (lat -90..90, lon -180..180)"}, 400)
+
+    return _route_response(lat1, lon1, lat2, lon2)
+
+
+@app.get("/route")
+def route_get():
+    """
+    Cacheable variant of /route: ``?from=lat,lon&to=lat,lon``.
+
+    Coordinates are normalized to 5 decimals, params the handler does not read
+    are dropped and the rest sorted; any other spelling is redirected (301) to
+    that canonical URL so a CDN sees a single cache key per route.
+    """
+    try:
+        lat1, lon1 = _parse_point(request.args.get("from", ""))
+        lat2, lon2 = _parse_point(request.args.get("to", ""))
+    except ValueError:
+        return _json({"error": "Query must include 'from' and 'to' as lat,lon"}, 400)
+
+    if not (_in_bounds(lat1, lon1) and _in_bounds(lat2, lon2)):
+        return _json({"error": "Coordinates out of range (lat -90..90, lon -180..180)"}, 400)
+    if request.args.get("output", "json") not in OUTPUTS:
+        return _json({"error": f"'output' must be one of {list(OUTPUTS)}"}, 400)
+
+    args = {name: request.args[name] for name in ROUTE_QUERY_PARAMS if name in request.args}
+    args["from"] = f"{lat1:.5f},{lon1:.5f}"
+    args["to"] = f"{lat2:.5f},{lon2:.5f}"
+    canonical = urlencode(sorted(args.items()), safe=",")
+    if request.query_string.decode() != canonical:
+        return redirect(f"{request.path}?{canonical}", 301)
+
+    return _route_response(lat1, lon1, lat2, lon2, cacheable=True)
 
 # ---------------------------------------------------------------------------
 # ENTRY POINT (for local python run; in Docker we use gunicorn)
@@ -0,0 +1,89 @@
+"""
+Test fixtures: a fake OSRM server on localhost that ``app`` is pointed at
+through ``OSRM_BASE`` before it is imported.
+
+Routes whose first longitude is ``SLOW_LON`` make the fake server sleep past
+``OSRM_TIMEOUT`` to simulate a hung OSRM; ``DELAY_LON`` delays the answer
+(within the timeout) so concurrent requests overlap.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import polyline
+import pytest
+
+SLOW_LON = 1.0
+DELAY_LON = 2.0
+OSRM_TIMEOUT = 0.3
+
+# Long enough that the JSON body is over COMPRESS_MIN_SIZE
+_POINTS = [(40.4 + i / 1000, -3.7 + i / 1000) for i in range(100)]
+
+
+class FakeOSRM(BaseHTTPRequestHandler):
+    calls = []
+
+    def do_GET(self):
+        FakeOSRM.calls.append(self.path)
+        lon1 = float(self.path.split("/route/v1/driving/")[1].split(",")[0])
+        if lon1 == SLOW_LON:
+            time.sleep(OSRM_TIMEOUT * 3)
+        elif lon1 == DELAY_LON:
+            time.sleep(OSRM_TIMEOUT / 2)
+
+        if "geometries=geojson" in self.path:
+            geometry = {"type": "LineString", "coordinates": [[lon, lat] for lat, lon in _POINTS]}
+        else:
+            geometry = polyline.encode(_POINTS, 6)
+        body = json.dumps({
+            "code": "Ok",
+            "routes": [{"distance": 7750.3, "duration": 769.3, "geometry": geometry}],
+        }).encode()
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client already gave up (read timeout)
+
+    def log_message(self, *args):
+        pass
+
+
+_server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOSRM)
+_server.daemon_threads = True
+threading.Thread(target=_server.serve_forever, daemon=True).start()
+
+os.environ["OSRM_BASE"] = f"http://127.0.0.1:{_server.server_address[1]}"
+os.environ["OSRM_TIMEOUT"] = str(OSRM_TIMEOUT)
+os.environ.pop("REDIS_URL", None)
+os.environ.pop("LIBOSRM_DATA", None)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _reset_state():
+    """Start every test with an empty cache, a closed breaker and no recorded calls."""
+    app_module.ROUTE_CACHE.clear()
+    app_module.BREAKER.close()
+    FakeOSRM.calls.clear()
+    yield
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def osrm_calls():
+    return FakeOSRM.calls
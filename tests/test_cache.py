@@ -0,0 +1,110 @@
+"""Route cache: Redis (L2) fallback and coalescing of concurrent OSRM calls."""
+
+import threading
+import time
+
+import msgpack
+import pytest
+
+import app
+from conftest import DELAY_LON
+
+BODY = {"from": [40.4066, -3.6893], "to": [40.4723, -3.6834]}
+
+
+class FakeRedis:
+    def __init__(self, value):
+        self.value, self.stored = value, {}
+
+    def get(self, key):
+        return self.value
+
+    def set(self, key, value, ex=None):
+        self.stored[key] = value
+
+
+@pytest.mark.parametrize("value", [
+    b"\xc1",                      # never-used msgpack byte
+    b"\x93\x01",                  # truncated array
+    b"\x01\x02",                  # extra data
+    msgpack.packb([1, 2, 3]),     # valid msgpack, not a route payload
+])
+def test_unreadable_redis_value_is_a_miss(client, osrm_calls, monkeypatch, value):
+    fake = FakeRedis(value)
+    monkeypatch.setattr(app, "REDIS", fake)
+
+    r = client.post("/route", json=BODY)
+
+    assert r.status_code == 200
+    assert len(osrm_calls) == 1
+    assert msgpack.unpackb(next(iter(fake.stored.values()))) == r.get_json()
+
+
+def test_redis_hit_skips_osrm(client, osrm_calls, monkeypatch):
+    cached = {"distance_m": 1.0, "duration_s": 2.0, "geometry": "abc"}
+    monkeypatch.setattr(app, "REDIS", FakeRedis(msgpack.packb(cached)))
+
+    r = client.post("/route", json=BODY)
+
+    assert r.get_json() == cached
+    assert osrm_calls == []
+
+
+def test_concurrent_identical_requests_share_one_osrm_call(osrm_calls):
+    body = {"from": [40.0, DELAY_LON], "to": [40.1, 2.1]}
+    barrier = threading.Barrier(10)
+    results = []
+
+    def post():
+        client = app.app.test_client()
+        barrier.wait()
+        r = client.post("/route", json=body)
+        results.append((r.status_code, r.get_json()))
+
+    threads = [threading.Thread(target=post) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(osrm_calls) == 1
+    assert len(results) == 10
+    assert all(result == results[0] for result in results)
+    assert results[0][0] == 200
+    assert app._INFLIGHT == {}
+
+
+def test_leader_failure_is_shared_with_waiters():
+    release = threading.Event()
+    calls = []
+    error = app.OSRMError("boom")
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        raise error
+
+    outcomes = []
+
+    def run():
+        try:
+            app._coalesced("key", fetch)
+        except app.OSRMError as e:
+            outcomes.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(5)]
+    threads[0].start()
+    deadline = time.monotonic() + 5
+    while "key" not in app._INFLIGHT and time.monotonic() < deadline:
+        time.sleep(0.001)
+    for t in threads[1:]:
+        t.start()
+    time.sleep(0.1)  # let the waiters block on the leader's Future
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert calls == [1]
+    assert len(outcomes) == 5
+    assert all(e is error for e in outcomes)
+    assert app._INFLIGHT == {}
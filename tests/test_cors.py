@@ -0,0 +1,49 @@
+"""CORS headers on every endpoint and the static preflight response."""
+
+import pytest
+
+import app
+from conftest import SLOW_LON
+
+BODY = {"from": [40.4066, -3.6893], "to": [40.4723, -3.6834]}
+CANONICAL = "/route?from=40.40660,-3.68930&to=40.47230,-3.68340"
+
+
+def _assert_cors(resp):
+    for name, value in app._CORS_HEADERS.items():
+        assert resp.headers.get(name) == value, name
+
+
+def test_repeated_preflights_leave_shared_response_unchanged(client):
+    before = list(app._PREFLIGHT.headers)
+    seen = []
+    for encoding in ("gzip", "br", "", "gzip"):
+        r = client.options("/route", headers={
+            "Origin": "https://front.example", "Access-Control-Request-Method": "POST",
+            "Accept-Encoding": encoding,
+        })
+        assert r.status_code == 204
+        _assert_cors(r)
+        seen.append(sorted(r.headers.items()))
+
+    assert list(app._PREFLIGHT.headers) == before
+    assert all(headers == seen[0] for headers in seen)
+
+
+@pytest.mark.parametrize("method, path, kwargs, status", [
+    ("post", "/route", {"json": BODY}, 200),
+    ("post", "/route", {"data": b"not json"}, 400),
+    ("post", "/route", {"json": {"from": [40.0, SLOW_LON], "to": [40.1, 1.1]}}, 502),
+    ("get", "/health", {}, 200),
+])
+def test_cors_headers_on_responses(client, method, path, kwargs, status):
+    r = getattr(client, method)(path, **kwargs)
+    assert r.status_code == status
+    _assert_cors(r)
+
+
+def test_cors_headers_on_not_modified(client):
+    etag = client.get(CANONICAL).headers["ETag"]
+    r = client.get(CANONICAL, headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    _assert_cors(r)
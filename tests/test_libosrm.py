@@ -0,0 +1,126 @@
+"""libosrm engine: translation of native results and the in-process /route path."""
+
+import importlib
+import sys
+import types
+
+import polyline
+import pytest
+
+import app
+
+LIBOSRM_DATA = "/data/madrid-latest.osrm"
+POINTS = [(40.4066, -3.6893), (40.4400, -3.6900), (40.4723, -3.6834)]
+NATIVE_POLYLINE6 = {"routes": [{
+    "distance": 7750.3, "duration": 769.3, "geometry": polyline.encode(POINTS, 6),
+}]}
+
+
+class FakeRouteParameters:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+
+class FakeEngine:
+    def __init__(self, result=None, error=None, config=None):
+        self.result, self.error, self.config = result, error, config
+        self.params, self.calls = None, 0
+
+    def Route(self, params):
+        self.params = params
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return self.result
+
+
+@pytest.fixture
+def fake_engine(monkeypatch):
+    monkeypatch.setattr(app, "RouteParameters", FakeRouteParameters, raising=False)
+    return FakeEngine
+
+
+def test_geojson_route_is_translated(fake_engine):
+    native = {"routes": [{
+        "distance": 1200.5, "duration": 95.0, "weight": 1200.5,
+        "geometry": {"type": "LineString", "coordinates": [(-3.7, 40.4), (-3.6, 40.5)]},
+    }]}
+    engine = fake_engine(result=native)
+
+    resp = app._libosrm_call(engine, 40.4, -3.7, 40.5, -3.6, "full", "geojson")
+
+    assert engine.params.kwargs == {
+        "coordinates": [(-3.7, 40.4), (-3.6, 40.5)],
+        "overview": "full", "geometries": "geojson", "steps": False,
+    }
+    assert resp == {"routes": [{
+        "distance": 1200.5, "duration": 95.0,
+        "geometry": {"type": "LineString", "coordinates": [[-3.7, 40.4], [-3.6, 40.5]]},
+    }]}
+
+
+def test_polyline_route_and_no_overview(fake_engine):
+    engine = fake_engine(result={"routes": [{"distance": 10.0, "duration": 2.0, "geometry": "abc"}]})
+    assert app._libosrm_call(engine, 40.4, -3.7, 40.5, -3.6, "simplified", "polyline6") == {
+        "routes": [{"distance": 10.0, "duration": 2.0, "geometry": "abc"}]
+    }
+
+    engine = fake_engine(result={"routes": [{"distance": 10.0, "duration": 2.0}]})
+    assert app._libosrm_call(engine, 40.4, -3.7, 40.5, -3.6, "false", "polyline6") == {
+        "routes": [{"distance": 10.0, "duration": 2.0, "geometry": None}]
+    }
+
+
+def test_engine_errors_map_to_non_tripping_osrm_error(fake_engine):
+    engine = fake_engine(error=RuntimeError("NoRoute"))
+    with pytest.raises(app.OSRMError) as exc:
+        app._libosrm_call(engine, 40.4, -3.7, 40.5, -3.6, "simplified", "polyline6")
+    assert exc.value.status == 400
+
+
+@pytest.fixture
+def libosrm_app(monkeypatch):
+    """Reload ``app`` with LIBOSRM_DATA set and fake osrm bindings installed."""
+    bindings = types.ModuleType("osrm")
+    bindings.OSRM = lambda **config: FakeEngine(result=NATIVE_POLYLINE6, config=config)
+    bindings.RouteParameters = FakeRouteParameters
+    monkeypatch.setitem(sys.modules, "osrm", bindings)
+    monkeypatch.setenv("LIBOSRM_DATA", LIBOSRM_DATA)
+    yield importlib.reload(app)
+
+    monkeypatch.undo()
+    importlib.reload(app)
+
+
+def test_redis_namespace_follows_the_engine(libosrm_app):
+    assert isinstance(libosrm_app.OSRM_ENGINE, FakeEngine)
+    assert libosrm_app.ROUTE_NAMESPACE == f"libosrm:{LIBOSRM_DATA}:MLD"
+    assert libosrm_app._redis_key((1, 2)).startswith(f"osrm:libosrm:{LIBOSRM_DATA}:MLD:")
+
+
+def test_redis_namespace_is_osrm_base_over_http():
+    assert app.OSRM_ENGINE is None
+    assert app.ROUTE_NAMESPACE == app.OSRM_BASE
+
+
+def test_route_endpoint_uses_engine(libosrm_app, osrm_calls):
+    engine = libosrm_app.OSRM_ENGINE
+    assert engine.config == {"algorithm": "MLD", "use_shared_memory": False,
+                             "storage_config": LIBOSRM_DATA}
+    client = libosrm_app.app.test_client()
+    body = {"from": [40.4066, -3.6893], "to": [40.4723, -3.6834]}
+
+    for _ in range(2):
+        r = client.post("/route?format=geojson", json=body)
+        assert r.status_code == 200
+        assert r.get_json() == {
+            "distance_m": 7750.3,
+            "duration_s": 769.3,
+            "geometry": {"type": "LineString",
+                         "coordinates": [[lon, lat] for lat, lon in POINTS]},
+        }
+
+    assert engine.calls == 1                      # second request came from the cache
+    assert engine.params.kwargs["geometries"] == "polyline6"
+    assert len(libosrm_app.ROUTE_CACHE) == 1
+    assert osrm_calls == []                       # no HTTP to OSRM at all
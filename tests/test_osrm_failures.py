@@ -0,0 +1,49 @@
+"""OSRM failure handling: timeouts, retries and the circuit breaker."""
+
+import threading
+import time
+
+import pytest
+import urllib3
+
+import app
+from conftest import OSRM_TIMEOUT, SLOW_LON
+
+
+def _slow_route(client):
+    return client.post("/route", json={"from": [40.0, SLOW_LON], "to": [40.1, 1.1]})
+
+
+def test_read_timeout_is_not_retried(client, osrm_calls):
+    start = time.monotonic()
+    r = _slow_route(client)
+    elapsed = time.monotonic() - start
+
+    assert r.status_code == 502
+    assert len(osrm_calls) == 1
+    assert elapsed < OSRM_TIMEOUT * 2
+    assert app.BREAKER.fail_counter == 1
+
+
+def test_breaker_opens_and_returns_503(client, monkeypatch):
+    monkeypatch.setattr(app.BREAKER, "fail_max", 2)
+    assert _slow_route(client).status_code == 502
+
+    r = _slow_route(client)
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == str(app.BREAKER_RESET_TIMEOUT)
+
+
+def test_pool_wait_is_bounded_and_does_not_trip_breaker():
+    pool = urllib3.PoolManager(maxsize=1, block=True)
+    slow_url = app.ROUTE_PREFIX + app._COORD_FMT(SLOW_LON, 40.0, 1.1, 40.1)
+    holder = threading.Thread(target=pool.request, args=("GET", slow_url), daemon=True)
+    holder.start()
+    time.sleep(0.1)  # let the holder take the only socket
+
+    start = time.monotonic()
+    with pytest.raises(app.OSRMBusyError):
+        app._osrm_call(slow_url, _request=pool.request, _pool_timeout=0.1)
+    assert time.monotonic() - start < OSRM_TIMEOUT
+    assert app.BREAKER.fail_counter == 0
+    holder.join()
@@ -0,0 +1,91 @@
+"""GET /route: canonical URLs, CDN caching headers and conditional requests."""
+
+import msgpack
+
+import app
+
+CANONICAL = "/route?format=geojson&from=40.40660,-3.68930&to=40.47230,-3.68340"
+
+
+def test_conditional_get_matches_plain_etag(client):
+    r = client.get(CANONICAL)
+    assert r.status_code == 200
+    assert "Content-Encoding" not in r.headers
+
+    r2 = client.get(CANONICAL, headers={"If-None-Match": r.headers["ETag"]})
+    assert r2.status_code == 304
+
+
+def test_conditional_get_matches_compressed_etag(client, osrm_calls):
+    for encoding in ("br", "gzip"):
+        headers = {"Accept-Encoding": encoding}
+        r = client.get(CANONICAL, headers=headers)
+        assert r.status_code == 200
+        assert r.headers["Content-Encoding"] == encoding
+        assert r.headers["ETag"].endswith(f':{encoding}"')
+
+        r2 = client.get(CANONICAL, headers={**headers, "If-None-Match": r.headers["ETag"]})
+        assert r2.status_code == 304
+        assert r2.headers["ETag"] == r.headers["ETag"]
+    assert len(osrm_calls) == 1
+
+
+def test_conditional_get_with_stale_etag_returns_body(client):
+    r = client.get(CANONICAL, headers={"If-None-Match": '"not-this-one"'})
+    assert r.status_code == 200
+    assert r.get_json()["geometry"]["type"] == "LineString"
+
+
+def test_redirects_to_canonical_url(client):
+    r = client.get("/route?to=40.4723,-3.6834&from=40.4066,-3.6893&format=geojson")
+    assert r.status_code == 301
+    assert r.headers["Location"] == CANONICAL
+
+
+def test_canonical_url_drops_unknown_params(client):
+    r = client.get(CANONICAL + "&_=1712345678&x=1")
+    assert r.status_code == 301
+    assert r.headers["Location"] == CANONICAL
+
+    r = client.get(r.headers["Location"])
+    assert r.status_code == 200
+
+
+def test_conditional_get_uses_weak_comparison(client):
+    r = client.get(CANONICAL, headers={"Accept-Encoding": "gzip"})
+    tag = r.headers["ETag"].strip('"')
+
+    for held in (f'W/"{tag}"', f'"{tag.partition(":")[0]}"', f'W/"{tag.partition(":")[0]}:deflate"'):
+        r2 = client.get(CANONICAL, headers={"If-None-Match": held})
+        assert r2.status_code == 304, held
+
+
+
+def test_etag_changes_when_route_data_changes(client):
+    r = client.get(CANONICAL)
+    old_etag = r.headers["ETag"]
+
+    # Simulate a rebuilt OSRM graph: the cached route now has different data
+    (key, payload), = app.ROUTE_CACHE.items()
+    app.ROUTE_CACHE[key] = {**payload, "distance_m": 9999.0}
+
+    r2 = client.get(CANONICAL, headers={"If-None-Match": old_etag})
+    assert r2.status_code == 200
+    assert r2.headers["ETag"] != old_etag
+    assert r2.get_json()["distance_m"] == 9999.0
+
+
+def test_representation_comes_from_url_not_accept(client):
+    r = client.get(CANONICAL, headers={"Accept": "application/msgpack"})
+    assert r.status_code == 200
+    assert r.mimetype == "application/json"
+    assert "accept" not in r.vary
+
+    r = client.get("/route?format=geojson&from=40.40660,-3.68930&output=msgpack&to=40.47230,-3.68340")
+    assert r.status_code == 200
+    assert r.mimetype == "application/msgpack"
+    assert msgpack.unpackb(r.data)["geometry"]["type"] == "LineString"
+
+
+def test_unknown_output_is_rejected(client):
+    assert client.get(CANONICAL + "&output=xml").status_code == 400
@@ -0,0 +1,72 @@
+"""Request validation: malformed bodies/queries are rejected before calling OSRM."""
+
+import pytest
+
+GOOD = [40.4066, -3.6893]
+
+
+@pytest.mark.parametrize("body", [
+    b"",
+    b"not json",
+    b"[]",
+    b'{"from": [40.4, -3.6]}',                               # missing "to"
+    b'{"from": "40.4,-3.6", "to": "40.5,-3.7"}',             # wrong shape
+    b'{"from": ["a", "b"], "to": [40.5, -3.7]}',             # non-numeric
+    b'{"from": [40.4, -3.6, 7], "to": [40.5, -3.7]}',        # 3-element point
+    b'{"from": [40.4], "to": [40.5, -3.7]}',                 # 1-element point
+    b'{"from": [null, -3.6], "to": [40.5, -3.7]}',
+])
+def test_post_rejects_malformed_body(client, osrm_calls, body):
+    r = client.post("/route", data=body, content_type="application/json")
+    assert r.status_code == 400
+    assert "from" in r.get_json()["error"]
+    assert osrm_calls == []
+
+
+@pytest.mark.parametrize("point", [[90.1, 0.0], [-90.1, 0.0], [0.0, 180.1], [0.0, -180.1]])
+def test_post_rejects_out_of_range(client, osrm_calls, point):
+    for body in ({"from": point, "to": GOOD}, {"from": GOOD, "to": point}):
+        r = client.post("/route", json=body)
+        assert r.status_code == 400
+        assert "out of range" in r.get_json()["error"]
+    assert osrm_calls == []
+
+
+def test_post_accepts_integer_coordinates_at_bounds(client):
+    r = client.post("/route", json={"from": [90, 180], "to": [-90, -180]})
+    assert r.status_code == 200
+
+
+@pytest.mark.parametrize("query", [
+    "",
+    "from=40.4,-3.6",                         # missing "to"
+    "from=40.4&to=40.5,-3.7",                 # 1-element point
+    "from=40.4,-3.6,7&to=40.5,-3.7",          # 3-element point
+    "from=a,b&to=40.5,-3.7",                  # non-numeric
+    "from=40.4,-3.6&to=",
+])
+def test_get_rejects_malformed_query(client, osrm_calls, query):
+    r = client.get(f"/route?{query}")
+    assert r.status_code == 400
+    assert "from" in r.get_json()["error"]
+    assert osrm_calls == []
+
+
+@pytest.mark.parametrize("query", [
+    "from=90.1,0&to=40.5,-3.7",
+    "from=40.4,-3.6&to=0,-180.1",
+    "from=nan,0&to=40.5,-3.7",
+    "from=inf,0&to=40.5,-3.7",
+])
+def test_get_rejects_out_of_range(client, osrm_calls, query):
+    r = client.get(f"/route?{query}")
+    assert r.status_code == 400
+    assert "out of range" in r.get_json()["error"]
+    assert osrm_calls == []
+
+
+@pytest.mark.parametrize("query", ["overview=everything", "geometries=wkt"])
+def test_rejects_unknown_geometry_options(client, osrm_calls, query):
+    r = client.post(f"/route?{query}", json={"from": GOOD, "to": GOOD})
+    assert r.status_code == 400
+    assert osrm_calls == []